@@ -20,20 +20,265 @@ import sys
 import shutil
 import sqlite3
 import subprocess
+import tempfile
 import logging
+import logging.handlers
 import argparse
 import json
+import html
 import datetime
 import platform
+import filecmp
+import glob
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, List, Tuple, Optional, Any, Union, Iterator, BinaryIO
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the json module
+    orjson = None
+
+try:
+    from markupsafe import escape as _escape_html
+except ImportError:  # optional, falls back to the html module
+    def _escape_html(value: Any) -> str:
+        """Escape a value for use as HTML text or attribute content."""
+        return html.escape(str(value))
+
+
+# Operating system name, looked up once per process
+_PLATFORM = platform.system()
+
+# Oldest SQLite library the repair strategies are tested against
+_MIN_SQLITE_VERSION = (3, 22, 0)
+
+# Error recorded when the sqlite3 command-line tool cannot be run
+_SQLITE_CLI_MISSING = "SQLite3 command-line tool not available"
+
+# First 16 bytes of every SQLite 3 database file
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+
+# Linux ioctl that clones a file's extents (reflink) on btrfs, XFS and similar
+_FICLONE = 0x40049409
+
+# Log level names accepted by --log-level
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+# Formats for records written to the repair log file and to the console
+_FILE_LOG_FORMAT = '%(relativeCreated)d ms - %(levelname)s - %(message)s'
+_CONSOLE_LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# PRAGMAs for connections that scan a whole database: serve reads from a
+# memory map and keep temporary results in memory
+_SCAN_PRAGMAS = (
+    "PRAGMA mmap_size=30000000000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Extra PRAGMAs for read-write scans of a strategy's own copy: hold the lock
+# for the whole scan. Read-only connections must not use them; an exclusive
+# lock on a mode=ro connection cannot read a WAL database ("disk I/O error")
+_EXCLUSIVE_SCAN_PRAGMAS = (
+    "PRAGMA locking_mode=EXCLUSIVE",
+    "PRAGMA read_uncommitted=1",
+)
+
+
+# Page cache, in KiB, shared by the scan connections of all repair strategies
+# running at once; each worker process gets an equal share
+_SCAN_CACHE_KIB = 512 * 1024
+
+
+def _apply_pragmas(conn: sqlite3.Connection, pragmas: Tuple[str, ...]) -> None:
+    """Apply tuning PRAGMAs, ignoring any the database rejects."""
+    for pragma in pragmas:
+        try:
+            conn.execute(pragma)
+        except sqlite3.Error:
+            pass
+
+
+def _clone_file(src_path: str, dst_path: str) -> None:
+    """
+    Copy a file and its metadata, sharing data blocks copy-on-write if possible.
+
+    On filesystems with reflink support the copy is instant and takes no
+    space until either file is modified; elsewhere this is shutil.copy2.
+    """
+    if fcntl is not None and sys.platform.startswith("linux"):
+        try:
+            with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            shutil.copystat(src_path, dst_path)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src_path, dst_path)
+
+
+class _BufferedFileHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that also closes its target when it is closed."""
+    
+    def close(self) -> None:
+        target = self.target
+        try:
+            super().close()
+        finally:
+            if target is not None:
+                target.close()
+
+
+def _init_worker_logging(log_file: str, level: int) -> None:
+    """
+    Send a repair worker process's log records to the repair log and console.
+    
+    Forked workers inherit the parent's handlers and need nothing; spawned
+    workers (the default on macOS and Windows) start with no handlers at all.
+    
+    Args:
+        log_file: Path to the repair log file
+        level: Level of the parent's root logger
+    """
+    root_logger = logging.getLogger()
+    if any(getattr(handler, "repair_log", False) for handler in root_logger.handlers):
+        return
+    
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter(_FILE_LOG_FORMAT))
+    file_handler.repair_log = True
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(_CONSOLE_LOG_FORMAT))
+    root_logger.addHandler(file_handler)
+    root_logger.addHandler(console_handler)
+    root_logger.setLevel(level)
+
+
+def _read_header(path: str, size: int = len(_SQLITE_MAGIC)) -> bytes:
+    """Read the first bytes of a file with a single positional read where supported."""
+    if not hasattr(os, "pread"):
+        with open(path, 'rb') as f:
+            return f.read(size)
+
+    # O_NOATIME avoids an access-time write, but only the file owner may use it
+    flags = os.O_RDONLY | getattr(os, "O_NOATIME", 0)
+    try:
+        fd = os.open(path, flags)
+    except PermissionError:
+        fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.pread(fd, size, 0)
+    finally:
+        os.close(fd)
+
+
+def _apple_time_to_local(timestamp: Any) -> Optional[str]:
+    """
+    Format an Apple Cocoa timestamp (nanoseconds since 2001-01-01) as local time.
+
+    Matches SQLite's datetime(ts/1000000000 + 978307200, 'unixepoch', 'localtime').
+    """
+    if timestamp is None:
+        return None
+    try:
+        # SQLite's integer division truncates toward zero
+        seconds = timestamp // 1000000000 if timestamp >= 0 else -(-timestamp // 1000000000)
+        return datetime.datetime.fromtimestamp(seconds + 978307200).strftime('%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _quote_identifier(name: str) -> str:
+    """Quote an SQL identifier, escaping embedded double quotes."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    """Quote an SQL string literal, escaping embedded single quotes."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _readonly_uri(path: str) -> str:
+    """Build an SQLite URI that opens the database at path read-only."""
+    return Path(path).resolve().as_uri() + "?mode=ro"
+
+
+class _ScratchConnection(sqlite3.Connection):
+    """Connection to a scratch copy of a database, deleted when the connection closes."""
+    
+    scratch_dir: Optional[str] = None
+    
+    def close(self) -> None:
+        super().close()
+        if self.scratch_dir:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+            self.scratch_dir = None
+
+
+def _count_table_rows(cursor: sqlite3.Cursor,
+                      tables: List[str]) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """
+    Count the rows of several tables with a single UNION ALL query.
+
+    If the batched query fails (typically because one table is corrupted),
+    each table is counted on its own so the readable ones are still reported.
+
+    Args:
+        cursor: Cursor on the database to inspect
+        tables: Names of the tables to count
+
+    Returns:
+        Tuple of (row counts by table, error message by table)
+    """
+    counts: Dict[str, int] = {}
+    failures: Dict[str, str] = {}
+    if not tables:
+        return counts, failures
+
+    count_sql = " UNION ALL ".join(
+        f"SELECT {_quote_literal(table)}, COUNT(*) FROM {_quote_identifier(table)}"
+        for table in tables
+    )
+    try:
+        cursor.execute(count_sql)
+        counts.update(cursor.fetchall())
+        return counts, failures
+    except sqlite3.DatabaseError:
+        pass
+
+    for table in tables:
+        try:
+            cursor.execute(f"SELECT COUNT(*) FROM {_quote_identifier(table)}")
+            counts[table] = cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            failures[table] = str(e)
+    return counts, failures
 
 
 class DatabaseRepairTool:
     """Advanced SQLite database repair tool with multiple strategies."""
 
+    # Strategies that must start from a byte-exact image of the input
+    # (.recover also scans freelist pages for deleted content)
+    _BYTE_COPY_STRATEGIES = ("_sqlite_recover_repair",)
+
     def __init__(self, input_path: str, output_dir: Optional[str] = None, 
-                 log_level: str = "INFO", is_imessage: bool = False):
+                 log_level: str = "INFO", is_imessage: bool = False,
+                 max_workers: Optional[int] = None, strategy_timeout: Optional[float] = None):
         """
         Initialize the database repair tool.
         
@@ -42,11 +287,22 @@ class DatabaseRepairTool:
             output_dir: Directory to save repaired database and reports (default: same as input)
             log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
             is_imessage: Whether the database is an iMessage database
+            max_workers: Number of processes used to run repair strategies
+                         (default: one per strategy, up to the CPU count; 1 runs them in-process)
+            strategy_timeout: Seconds after which an integrity check or VACUUM is
+                              aborted (default: no limit)
         """
         # Setup paths
         self.input_path = os.path.abspath(input_path)
         self.db_filename = os.path.basename(input_path)
+        self._base, self._ext = os.path.splitext(self.db_filename)
         self.is_imessage = is_imessage
+        self.max_workers = max_workers
+        self.strategy_timeout = strategy_timeout
+        
+        # Page cache for each scan connection, in KiB; divided between the
+        # worker processes while strategies run in parallel
+        self._scan_cache_kib = _SCAN_CACHE_KIB
         
         # Setup output directory
         if output_dir:
@@ -58,7 +314,7 @@ class DatabaseRepairTool:
         os.makedirs(self.output_dir, exist_ok=True)
         
         # Setup logging
-        self.log_file = os.path.join(self.output_dir, f"repair_{os.path.splitext(self.db_filename)[0]}.log")
+        self.log_file = os.path.join(self.output_dir, f"repair_{self._base}.log")
         self._setup_logging(log_level)
         
         # Initialize results
@@ -67,7 +323,7 @@ class DatabaseRepairTool:
                 "original_path": self.input_path,
                 "size": os.path.getsize(self.input_path) if os.path.exists(self.input_path) else 0,
                 "sqlite_version": self._get_sqlite_version(),
-                "platform": platform.system(),
+                "platform": _PLATFORM,
                 "is_imessage": is_imessage
             },
             "repair_attempts": [],
@@ -77,39 +333,73 @@ class DatabaseRepairTool:
             "report_path": None
         }
         
+        # Report table rows for results["repair_attempts"], built as attempts are recorded
+        self._attempt_html_rows: List[str] = []
+        
+        # Set to False once a strategy finds the sqlite3 command-line tool missing
+        self._sqlite_cli_available = True
+        
+        # Validation results keyed by (path, mtime_ns, size, fast)
+        self._validation_cache: Dict[Tuple[str, int, int, bool], Dict[str, Any]] = {}
+        
+        # Table names and schemas keyed by (path, mtime_ns, size)
+        self._table_cache: Dict[Tuple[str, int, int], Tuple[List[str], Dict[str, Optional[str]]]] = {}
+        
         self.logger.info(f"Initialized repair tool for {self.input_path}")
         self.logger.info(f"SQLite version: {self.results['database_info']['sqlite_version']}")
         self.logger.info(f"Platform: {self.results['database_info']['platform']}")
+        if sqlite3.sqlite_version_info < _MIN_SQLITE_VERSION:
+            self.logger.warning(
+                f"SQLite {sqlite3.sqlite_version} is older than "
+                f"{'.'.join(map(str, _MIN_SQLITE_VERSION))}; some repair strategies may fail"
+            )
 
     def _setup_logging(self, log_level: str):
         """Setup logging configuration."""
-        level = getattr(logging, log_level.upper(), logging.INFO)
-        
-        # Configure logging
-        logging.basicConfig(
-            level=level,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_file),
-                logging.StreamHandler()
-            ]
+        level = _LEVELS.get(log_level.upper(), logging.INFO)
+        
+        # Buffer file records and stamp them with the cheap relative time;
+        # the buffer is flushed on errors, when full and at the end of a repair
+        file_handler = logging.FileHandler(self.log_file)
+        file_handler.setFormatter(logging.Formatter(_FILE_LOG_FORMAT))
+        buffered_handler = _BufferedFileHandler(
+            capacity=4096,
+            flushLevel=logging.ERROR,
+            target=file_handler
         )
+        buffered_handler.repair_log = True
+        
+        # Configure logging once per process; later instances only swap in
+        # their own log file so records are not written once per instance
+        root_logger = logging.getLogger()
+        if not root_logger.hasHandlers():
+            logging.basicConfig(
+                level=level,
+                format=_CONSOLE_LOG_FORMAT,
+                handlers=[
+                    buffered_handler,
+                    logging.StreamHandler()
+                ]
+            )
+        else:
+            for handler in list(root_logger.handlers):
+                if getattr(handler, "repair_log", False):
+                    root_logger.removeHandler(handler)
+                    handler.close()
+            root_logger.addHandler(buffered_handler)
+            root_logger.setLevel(level)
         self.logger = logging.getLogger(__name__)
-        self.logger.info(f"Logging initialized at level {log_level}")
+        self.logger.info(f"Logging initialized at level {log_level} on {datetime.datetime.now().isoformat()}")
         self.logger.info(f"Log file: {self.log_file}")
 
+    def _flush_logs(self) -> None:
+        """Write out buffered log records."""
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+
     def _get_sqlite_version(self) -> str:
         """Get the installed SQLite version."""
-        try:
-            conn = sqlite3.connect(':memory:')
-            cursor = conn.cursor()
-            cursor.execute('SELECT sqlite_version()')
-            version = cursor.fetchone()[0]
-            conn.close()
-            return version
-        except Exception as e:
-            self.logger.error(f"Could not determine SQLite version: {e}")
-            return "Unknown"
+        return sqlite3.sqlite_version
 
     def create_backup(self) -> str:
         """Create a backup of the original database file."""
@@ -117,30 +407,275 @@ class DatabaseRepairTool:
         os.makedirs(backup_dir, exist_ok=True)
         
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        base, ext = os.path.splitext(self.db_filename)
-        backup_path = os.path.join(backup_dir, f"{base}_backup_{timestamp}{ext}")
+        backup_path = os.path.join(backup_dir, f"{self._base}_backup_{timestamp}{self._ext}")
         
         try:
-            shutil.copy2(self.input_path, backup_path)
+            # Reuse an earlier backup if the database has not changed since
+            existing_backup = self._find_identical_backup(glob.glob(os.path.join(
+                glob.escape(backup_dir), f"{glob.escape(self._base)}_backup_*{glob.escape(self._ext)}")))
+            if existing_backup:
+                self.logger.info(f"Database unchanged since backup at: {existing_backup}")
+                return existing_backup
+            
+            _clone_file(self.input_path, backup_path)
             self.logger.info(f"Created backup at: {backup_path}")
             return backup_path
         except Exception as e:
             self.logger.error(f"Failed to create backup: {e}")
             raise
 
-    def validate_database(self, db_path: str) -> Dict[str, Any]:
+    def _find_identical_backup(self, candidates: List[str]) -> Optional[str]:
+        """
+        Find a backup whose contents match the input database.
+        
+        Backups keep the original's size and modification time, so only
+        files matching both are compared byte for byte.
+        
+        Args:
+            candidates: Paths of earlier backups
+            
+        Returns:
+            Path to the newest identical backup, or None
+        """
+        stat = os.stat(self.input_path)
+        for candidate in sorted(candidates, reverse=True):
+            try:
+                candidate_stat = os.stat(candidate)
+            except OSError:
+                continue
+            if (candidate_stat.st_size == stat.st_size and
+                    candidate_stat.st_mtime_ns == stat.st_mtime_ns and
+                    filecmp.cmp(self.input_path, candidate, shallow=False)):
+                return candidate
+        return None
+
+    @contextmanager
+    def _time_limit(self, conn: sqlite3.Connection) -> Iterator[Dict[str, bool]]:
+        """
+        Abort the statement running on conn once strategy_timeout seconds pass.
+        
+        A progress handler checks the deadline between VM instructions. Some
+        opcodes, such as the integrity check itself, run for a long time
+        without calling it, so a watchdog timer also calls conn.interrupt().
+        The aborted statement raises sqlite3.OperationalError ("interrupted").
+        
+        Args:
+            conn: Connection running the long statement
+            
+        Yields:
+            Dictionary whose "timed_out" entry is set once the block exits
+            past the time limit
+        """
+        limit = {"timed_out": False}
+        if not self.strategy_timeout:
+            yield limit
+            return
+        
+        deadline = time.monotonic() + self.strategy_timeout
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+        watchdog = threading.Timer(self.strategy_timeout, conn.interrupt)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            yield limit
+        finally:
+            watchdog.cancel()
+            conn.set_progress_handler(None, 0)
+            if time.monotonic() > deadline:
+                limit["timed_out"] = True
+                self.logger.warning(f"Operation exceeded the {self.strategy_timeout}s time limit")
+
+    def _open_ro(self, db_path: str) -> sqlite3.Connection:
+        """
+        Open a database read-only with the scan PRAGMAs applied.
+        
+        The database is also opened immutable, which skips file locking and
+        change detection, unless a -wal or -journal file sits next to it: an
+        immutable connection ignores both and would miss the changes in a WAL
+        or read a half-written image that a hot journal should roll back.
+        Rolling back a hot journal needs write access, so in that case the
+        database is opened from a rolled-back scratch copy instead.
+        
+        Args:
+            db_path: Path to the database to open
+            
+        Returns:
+            Open connection in autocommit mode
+        """
+        uri = _readonly_uri(db_path)
+        has_journal = os.path.exists(f"{db_path}-journal")
+        if not has_journal and not os.path.exists(f"{db_path}-wal"):
+            uri += "&immutable=1"
+        conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+        if has_journal:
+            try:
+                # The first read checks for a hot journal
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            except sqlite3.OperationalError as e:
+                if "readonly" not in str(e):
+                    raise
+                conn.close()
+                self.logger.info(f"Rolling back the hot journal of {db_path} on a scratch copy")
+                conn = self._open_rolled_back_copy(db_path)
+        self._apply_scan_pragmas(conn)
+        return conn
+
+    def _apply_scan_pragmas(self, conn: sqlite3.Connection, exclusive: bool = False) -> None:
+        """
+        Apply the scan PRAGMAs and this process's share of the page cache.
+        
+        Args:
+            conn: Connection that will scan a whole database
+            exclusive: Also hold the lock for the whole scan (read-write connections only)
+        """
+        pragmas = _SCAN_PRAGMAS + (f"PRAGMA cache_size=-{self._scan_cache_kib}",)
+        if exclusive:
+            pragmas += _EXCLUSIVE_SCAN_PRAGMAS
+        _apply_pragmas(conn, pragmas)
+
+    def _open_rolled_back_copy(self, db_path: str) -> sqlite3.Connection:
+        """
+        Copy a database and its hot journal, and open the copy read-write so
+        SQLite rolls the journal back there instead of in the original.
+        
+        Args:
+            db_path: Path to the database with a hot journal
+            
+        Returns:
+            Open connection in autocommit mode; closing it deletes the copy
+        """
+        scratch_dir = tempfile.mkdtemp(prefix="dbfix_rollback_")
+        copy_path = os.path.join(scratch_dir, os.path.basename(db_path))
+        try:
+            _clone_file(db_path, copy_path)
+            _clone_file(f"{db_path}-journal", f"{copy_path}-journal")
+            conn = sqlite3.connect(copy_path, isolation_level=None, factory=_ScratchConnection)
+            try:
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            except sqlite3.Error:
+                conn.close()
+                raise
+        except Exception:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+            raise
+        conn.scratch_dir = scratch_dir
+        return conn
+
+    def _copy_database(self, src_path: str, dst_path: str) -> None:
+        """
+        Copy a database through the SQLite Online Backup API.
+        
+        Falls back to a plain file copy if SQLite cannot read the source.
+        
+        Args:
+            src_path: Path to the database to copy
+            dst_path: Path of the copy
+        """
+        self._invalidate_validation(dst_path)
+        try:
+            src = sqlite3.connect(_readonly_uri(src_path), uri=True)
+            try:
+                dst = sqlite3.connect(dst_path)
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+            finally:
+                src.close()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Backup API copy failed ({e}), falling back to file copy")
+            if os.path.exists(dst_path):
+                os.remove(dst_path)
+            shutil.copy2(src_path, dst_path)
+
+    def validate_database(self, db_path: str, fast: bool = True) -> Dict[str, Any]:
         """
         Validate the database integrity and collect information.
         
+        Results are cached until the file's modification time or size changes.
+        
         Args:
             db_path: Path to the database to validate
+            fast: Use PRAGMA quick_check, which skips the index-vs-table
+                  consistency checks, instead of the full PRAGMA integrity_check
             
         Returns:
             Dictionary with validation results
         """
+        try:
+            stat = os.stat(db_path)
+        except OSError:
+            return self._validate_database(db_path, fast)
+        
+        path = os.path.abspath(db_path)
+        key = (path, stat.st_mtime_ns, stat.st_size, fast)
+        cached = self._validation_cache.get(key)
+        if cached is None and fast:
+            # A full integrity check also answers a quick one
+            cached = self._validation_cache.get((path, stat.st_mtime_ns, stat.st_size, False))
+        if cached is not None:
+            self.logger.debug(f"Using cached validation for {db_path}")
+            return cached
+        
+        validation_results = self._validate_database(db_path, fast)
+        # A timed-out check says nothing about the database, so it is not kept
+        if not validation_results["timed_out"]:
+            self._validation_cache[key] = validation_results
+        return validation_results
+
+    def _invalidate_validation(self, db_path: str) -> None:
+        """Drop cached validation results and schemas for a database that is about to change."""
+        path = os.path.abspath(db_path)
+        for key in [key for key in self._validation_cache if key[0] == path]:
+            del self._validation_cache[key]
+        for key in [key for key in self._table_cache if key[0] == path]:
+            del self._table_cache[key]
+
+    def _get_tables(self, db_path: str,
+                    conn: Optional[sqlite3.Connection] = None) -> Tuple[List[str], Dict[str, Optional[str]]]:
+        """
+        Get the user tables of a database and their CREATE statements.
+        
+        SQLite's internal tables (sqlite_sequence, sqlite_stat1, ...) are left
+        out. Results are cached until the file's modification time or size changes.
+        
+        Args:
+            db_path: Path to the database
+            conn: Open connection to the database to query on a cache miss
+            
+        Returns:
+            Tuple of (table names, CREATE statement by table name)
+            
+        Raises:
+            sqlite3.Error: If the schema cannot be read
+        """
+        stat = os.stat(db_path)
+        key = (os.path.abspath(db_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._table_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        query = ("SELECT name, sql FROM sqlite_master "
+                 "WHERE type='table' AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\'")
+        if conn is None:
+            conn = self._open_ro(db_path)
+            try:
+                rows = conn.execute(query).fetchall()
+            finally:
+                conn.close()
+        else:
+            rows = conn.execute(query).fetchall()
+        
+        schemas = dict(rows)
+        self._table_cache[key] = (list(schemas), schemas)
+        return self._table_cache[key]
+
+    def _validate_database(self, db_path: str, fast: bool) -> Dict[str, Any]:
+        """Run the validation behind validate_database without caching."""
         validation_results = {
             "is_valid_sqlite": False,
             "integrity_check": None,
+            "timed_out": False,
             "tables": [],
             "table_counts": {},
             "errors": []
@@ -153,11 +688,10 @@ class DatabaseRepairTool:
         
         # Check SQLite header
         try:
-            with open(db_path, 'rb') as f:
-                header = f.read(16)
-                validation_results["is_valid_sqlite"] = (header[:16] == b'SQLite format 3\x00')
-                if not validation_results["is_valid_sqlite"]:
-                    validation_results["errors"].append("Not a valid SQLite database (header check failed)")
+            header = _read_header(db_path)
+            validation_results["is_valid_sqlite"] = (header == _SQLITE_MAGIC)
+            if not validation_results["is_valid_sqlite"]:
+                validation_results["errors"].append("Not a valid SQLite database (header check failed)")
         except Exception as e:
             validation_results["errors"].append(f"Error checking SQLite header: {e}")
         
@@ -167,31 +701,34 @@ class DatabaseRepairTool:
         
         # Try to connect and get database information
         try:
-            conn = sqlite3.connect(db_path)
+            conn = self._open_ro(db_path)
             cursor = conn.cursor()
             
             # Check integrity
+            limit = {"timed_out": False}
             try:
-                cursor.execute("PRAGMA integrity_check")
-                integrity_result = cursor.fetchone()[0]
+                with self._time_limit(conn) as limit:
+                    cursor.execute("PRAGMA quick_check" if fast else "PRAGMA integrity_check")
+                    integrity_result = cursor.fetchone()[0]
                 validation_results["integrity_check"] = integrity_result
             except sqlite3.Error as e:
-                validation_results["errors"].append(f"Integrity check failed: {e}")
+                if limit["timed_out"]:
+                    validation_results["timed_out"] = True
+                    validation_results["errors"].append(
+                        f"Integrity check timed out after {self.strategy_timeout}s")
+                else:
+                    validation_results["errors"].append(f"Integrity check failed: {e}")
             
             # Get table list
             try:
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                tables = [row[0] for row in cursor.fetchall()]
+                tables, _ = self._get_tables(db_path, conn)
                 validation_results["tables"] = tables
                 
-                # Get row counts for each table
-                for table in tables:
-                    try:
-                        cursor.execute(f"SELECT COUNT(*) FROM [{table}]")
-                        count = cursor.fetchone()[0]
-                        validation_results["table_counts"][table] = count
-                    except sqlite3.Error as e:
-                        validation_results["errors"].append(f"Could not count rows in table {table}: {e}")
+                # Get row counts for all tables in one query
+                counts, failures = _count_table_rows(cursor, tables)
+                validation_results["table_counts"] = counts
+                for table, error in failures.items():
+                    validation_results["errors"].append(f"Could not count rows in table {table}: {error}")
             except sqlite3.Error as e:
                 validation_results["errors"].append(f"Could not list tables: {e}")
             
@@ -219,92 +756,275 @@ class DatabaseRepairTool:
         
         # Validate original database
         self.logger.info("Validating original database...")
-        original_validation = self.validate_database(self.input_path)
+        original_validation = self.validate_database(self.input_path, fast=False)
         self.results["original_validation"] = original_validation
         
         if original_validation["integrity_check"] == "ok":
             self.logger.info("Database integrity check passed. No repair needed.")
             self.results["success"] = True
             self.results["repaired_path"] = self.input_path
+            self._flush_logs()
             return True
         
         # Create output path for repaired database
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        base, ext = os.path.splitext(self.db_filename)
-        repaired_path = os.path.join(self.output_dir, f"{base}_repaired_{timestamp}{ext}")
+        repaired_path = os.path.join(self.output_dir, f"{self._base}_repaired_{timestamp}{self._ext}")
         
         # Define repair strategies
         repair_strategies = [
-            self._basic_pragma_repair,
-            self._vacuum_repair,
-            self._sqlite_recover_repair,
-            self._dump_and_reload_repair,
-            self._salvage_data_repair
+            "_basic_pragma_repair",
+            "_vacuum_repair",
+            "_sqlite_recover_repair",
+            "_dump_and_reload_repair",
+            "_salvage_data_repair"
         ]
+        tasks = [(name, f"{repaired_path}_{name}") for name in repair_strategies]
         
-        # Try each repair strategy
-        success = False
-        for strategy in repair_strategies:
-            strategy_name = strategy.__name__.replace("_", " ").title()
-            self.logger.info(f"Attempting repair with: {strategy_name}")
-            
-            # Create a fresh copy for each strategy
-            try:
-                strategy_path = f"{repaired_path}_{strategy.__name__}"
-                shutil.copy2(self.input_path, strategy_path)
-                
-                # Attempt repair
-                start_time = datetime.datetime.now()
-                strategy_result = strategy(strategy_path)
-                end_time = datetime.datetime.now()
-                duration = (end_time - start_time).total_seconds()
-                
-                # Record attempt
-                attempt_info = {
-                    "strategy": strategy_name,
-                    "success": strategy_result["success"],
-                    "path": strategy_path if strategy_result["success"] else None,
-                    "duration": duration,
-                    "details": strategy_result.get("details", {})
-                }
-                self.results["repair_attempts"].append(attempt_info)
+        # Strategies ruled out by what earlier attempts found
+        skipped: Dict[str, str] = {}
+        if not self._sqlite_cli_available:
+            skipped["_sqlite_recover_repair"] = _SQLITE_CLI_MISSING
+        
+        # Each strategy works on its own copy, so they can run in parallel
+        workers = self.max_workers or min(len(tasks), os.cpu_count() or 1)
+        
+        if workers > 1:
+            self.logger.info(f"Running {len(tasks)} repair strategies on {workers} worker processes")
+            # Forked workers inherit the log buffer; empty it first so records
+            # are not written twice
+            self._flush_logs()
+            # Workers get their share of the page cache through the pickled tool
+            self._scan_cache_kib = _SCAN_CACHE_KIB // workers
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_logging,
+                                     initargs=(self.log_file, logging.getLogger().level)) as executor:
+                futures = {}
+                for name, strategy_path in tasks:
+                    if name not in skipped:
+                        futures[name] = executor.submit(self._run_strategy, name, strategy_path)
                 
-                # If successful, validate the repaired database
-                if strategy_result["success"]:
-                    self.logger.info(f"Strategy {strategy_name} succeeded")
-                    validation = self.validate_database(strategy_path)
-                    
-                    # Check if the repaired database is better than the original
-                    is_better = self._is_repair_better(original_validation, validation)
+                # Results are recorded in strategy order, as they would be when
+                # run in-process, so the chosen repair does not depend on which
+                # worker finishes first
+                finished: Dict[str, Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = {}
+                next_task = 0
+                perfect = False
+                names = {future: name for name, future in futures.items()}
+                for future in as_completed(names):
+                    if future.cancelled():
+                        continue
+                    name = names[future]
+                    try:
+                        finished[name] = future.result()
+                    except Exception as e:
+                        strategy_name = name.replace("_", " ").title()
+                        self.logger.error(f"Error during {strategy_name}: {e}")
+                        finished[name] = {
+                            "strategy": strategy_name,
+                            "success": False,
+                            "error": str(e)
+                        }, None
                     
-                    if is_better:
-                        self.logger.info(f"Repaired database is better than original")
-                        success = True
-                        self.results["success"] = True
-                        self.results["repaired_path"] = strategy_path
-                        self.results["repaired_validation"] = validation
-                        
-                        # If this is a perfect repair, we can stop
-                        if validation["integrity_check"] == "ok":
-                            self.logger.info("Perfect repair achieved. Stopping repair process.")
+                    while next_task < len(tasks):
+                        name = tasks[next_task][0]
+                        if name in skipped:
+                            if not perfect:
+                                self._record_skipped(name, skipped[name])
+                        elif futures[name].cancelled():
+                            pass
+                        elif name in finished:
+                            attempt_info, validation = finished.pop(name)
+                            if perfect:
+                                # Strategies that were already running when a
+                                # perfect repair was found are recorded but not
+                                # considered
+                                self._append_attempt(attempt_info)
+                            elif self._record_attempt(attempt_info, validation, original_validation):
+                                perfect = True
+                                for pending in futures.values():
+                                    pending.cancel()
+                            else:
+                                # Skip strategies that have not started yet if
+                                # this result already rules them out
+                                for skip_name, reason in self._strategies_to_skip(name, attempt_info).items():
+                                    skip_future = futures.get(skip_name)
+                                    if skip_future is not None and skip_future.cancel():
+                                        skipped[skip_name] = reason
+                        else:
                             break
-                    else:
-                        self.logger.info("Repaired database is not better than original")
-                else:
-                    self.logger.warning(f"Strategy {strategy_name} failed")
-            
-            except Exception as e:
-                self.logger.error(f"Error during {strategy_name}: {e}")
-                self.results["repair_attempts"].append({
-                    "strategy": strategy_name,
-                    "success": False,
-                    "error": str(e)
-                })
+                        next_task += 1
+            self._scan_cache_kib = _SCAN_CACHE_KIB
+        else:
+            for name, strategy_path in tasks:
+                if name in skipped:
+                    self._record_skipped(name, skipped[name])
+                    continue
+                attempt_info, validation = self._run_strategy(name, strategy_path)
+                if self._record_attempt(attempt_info, validation, original_validation):
+                    break
+                skipped.update(self._strategies_to_skip(name, attempt_info))
         
         # Generate report
         self._generate_report()
+        self._flush_logs()
+        
+        return self.results["success"]
+
+    def _run_strategy(self, method_name: str, strategy_path: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Run one repair strategy on a fresh copy of the input database.
+        
+        This runs in a worker process when strategies are run in parallel.
+        
+        Args:
+            method_name: Name of the repair strategy method
+            strategy_path: Path for this strategy's copy of the database
+            
+        Returns:
+            Tuple of (attempt information, validation of the repaired copy
+            or None if the strategy failed)
+        """
+        strategy = getattr(self, method_name)
+        strategy_name = method_name.replace("_", " ").title()
+        self.logger.info(f"Attempting repair with: {strategy_name}")
+        
+        # Create a fresh copy for each strategy
+        try:
+            if method_name in self._BYTE_COPY_STRATEGIES:
+                self._invalidate_validation(strategy_path)
+                shutil.copy2(self.input_path, strategy_path)
+            else:
+                self._copy_database(self.input_path, strategy_path)
+            
+            # Attempt repair
+            start_time = time.perf_counter()
+            strategy_result = strategy(strategy_path)
+            # Round to the microsecond precision of the datetime-based timings
+            duration = round(time.perf_counter() - start_time, 6)
+            self._invalidate_validation(strategy_path)
+            
+            # Record attempt
+            attempt_info = {
+                "strategy": strategy_name,
+                "success": strategy_result["success"],
+                "path": strategy_path if strategy_result["success"] else None,
+                "duration": duration,
+                "details": strategy_result.get("details", {})
+            }
+            
+            # If successful, validate the repaired database
+            validation = None
+            if strategy_result["success"]:
+                self.logger.info(f"Strategy {strategy_name} succeeded")
+                validation = self.validate_database(strategy_path)
+                # The original was validated with a full integrity check, and
+                # quick_check misses index damage, so confirm a passing copy
+                # the same way before the two are compared
+                if validation["integrity_check"] == "ok":
+                    validation = self.validate_database(strategy_path, fast=False)
+            else:
+                self.logger.warning(f"Strategy {strategy_name} failed")
+            
+            return attempt_info, validation
+        
+        except Exception as e:
+            self.logger.error(f"Error during {strategy_name}: {e}")
+            return {
+                "strategy": strategy_name,
+                "success": False,
+                "error": str(e)
+            }, None
+        
+        finally:
+            # Worker processes exit without running logging's shutdown hook
+            self._flush_logs()
+
+    def _strategies_to_skip(self, method_name: str, attempt_info: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Work out which remaining strategies a finished attempt makes pointless.
+        
+        Args:
+            method_name: Name of the strategy method that finished
+            attempt_info: Attempt information returned by _run_strategy
+            
+        Returns:
+            Dictionary mapping strategy method names to the reason for skipping them
+        """
+        details = attempt_info.get("details", {})
+        skip = {}
+        
+        # Salvage needs readable table schemas just like dump and reload does.
+        # An error means dump and reload stopped for another reason, such as
+        # failing to write its scratch database, and salvage may still work
+        if (method_name == "_dump_and_reload_repair" and "tables_dumped" in details
+                and not details["tables_dumped"] and "error" not in details):
+            skip["_salvage_data_repair"] = "No table schemas could be read by dump and reload"
+        
+        # Remember a missing sqlite3 CLI instead of shelling out again
+        if method_name == "_sqlite_recover_repair" and details.get("error") == _SQLITE_CLI_MISSING:
+            self._sqlite_cli_available = False
+        
+        return skip
+
+    def _record_skipped(self, method_name: str, reason: str) -> None:
+        """Record a strategy that was skipped without running."""
+        strategy_name = method_name.replace("_", " ").title()
+        self.logger.info(f"Skipping {strategy_name}: {reason}")
+        self._append_attempt({
+            "strategy": strategy_name,
+            "success": False,
+            "skipped": reason
+        })
+
+    def _append_attempt(self, attempt_info: Dict[str, Any]) -> None:
+        """Add an attempt to the results along with its HTML report row."""
+        self.results["repair_attempts"].append(attempt_info)
+        result = ('<td class="success">Success</td>' if attempt_info["success"]
+                  else '<td class="failure">Failed</td>')
+        self._attempt_html_rows.append(
+            f"            <tr><td>{_escape_html(attempt_info['strategy'])}</td>{result}"
+            f"<td>{attempt_info.get('duration', 'N/A')}</td>"
+            f"<td>{_escape_html(attempt_info.get('path', 'N/A'))}</td></tr>\n"
+        )
+
+    def _record_attempt(self, attempt_info: Dict[str, Any], validation: Optional[Dict[str, Any]],
+                        original_validation: Dict[str, Any]) -> bool:
+        """
+        Record a repair attempt and keep its result if it beats the original.
         
-        return success
+        Args:
+            attempt_info: Attempt information returned by _run_strategy
+            validation: Validation of the repaired copy, or None if the strategy failed
+            original_validation: Validation results for original database
+            
+        Returns:
+            True if the attempt produced a perfect repair, False otherwise
+        """
+        self._append_attempt(attempt_info)
+        
+        extracted_path = attempt_info.get("details", {}).get("extracted_messages_path")
+        if extracted_path:
+            self.results["extracted_messages_path"] = extracted_path
+        
+        if validation is None:
+            return False
+        
+        # Check if the repaired database is better than the original
+        if not self._is_repair_better(original_validation, validation):
+            self.logger.info("Repaired database is not better than original")
+            return False
+        
+        strategy_path = attempt_info["path"]
+        self.logger.info(f"Repaired database is better than original")
+        self.results["success"] = True
+        self.results["repaired_path"] = strategy_path
+        self.results["repaired_validation"] = validation
+        
+        # If this is a perfect repair, we can stop
+        if validation["integrity_check"] != "ok":
+            return False
+        
+        self.logger.info("Perfect repair achieved. Stopping repair process.")
+        return True
 
     def _is_repair_better(self, original_validation: Dict[str, Any], 
                           repaired_validation: Dict[str, Any]) -> bool:
@@ -362,9 +1082,9 @@ class DatabaseRepairTool:
             conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             
-            # List of PRAGMA commands to try
+            # List of PRAGMA commands to try (the full integrity check is
+            # left to validate_database)
             pragmas = [
-                "PRAGMA integrity_check",
                 "PRAGMA quick_check",
                 "PRAGMA foreign_key_check"
             ]
@@ -373,12 +1093,16 @@ class DatabaseRepairTool:
                 result["details"]["pragmas_attempted"].append(pragma)
                 try:
                     self.logger.info(f"Executing {pragma}")
-                    cursor.execute(pragma)
-                    pragma_result = cursor.fetchone()
+                    limit = {"timed_out": False}
+                    with self._time_limit(conn) as limit:
+                        cursor.execute(pragma)
+                        pragma_result = cursor.fetchone()
                     self.logger.info(f"Result: {pragma_result}")
                     result["details"]["pragmas_succeeded"].append(pragma)
                 except sqlite3.Error as e:
                     self.logger.warning(f"PRAGMA failed: {pragma} - {e}")
+                    if limit["timed_out"]:
+                        result["details"].setdefault("pragmas_timed_out", []).append(pragma)
             
             # Success if at least one PRAGMA succeeded
             result["success"] = len(result["details"]["pragmas_succeeded"]) > 0
@@ -408,26 +1132,19 @@ class DatabaseRepairTool:
         try:
             conn = sqlite3.connect(db_path)
             
-            # Try integrity check first
-            try:
-                cursor = conn.cursor()
-                cursor.execute("PRAGMA integrity_check")
-                integrity_result = cursor.fetchone()[0]
-                result["details"]["integrity_check"] = integrity_result
-            except sqlite3.Error as e:
-                self.logger.warning(f"Integrity check failed: {e}")
-                result["details"]["integrity_check_error"] = str(e)
-            
             # Try vacuum
             try:
                 self.logger.info("Executing VACUUM")
-                conn.execute("VACUUM")
+                limit = {"timed_out": False}
+                with self._time_limit(conn) as limit:
+                    conn.execute("VACUUM")
                 conn.commit()
                 self.logger.info("VACUUM completed successfully")
                 result["success"] = True
             except sqlite3.Error as e:
                 self.logger.warning(f"VACUUM failed: {e}")
                 result["details"]["vacuum_error"] = str(e)
+                result["details"]["timed_out"] = limit["timed_out"]
             
             conn.close()
         except sqlite3.Error as e:
@@ -461,70 +1178,64 @@ class DatabaseRepairTool:
             result["details"]["sqlite3_cli_version"] = version_check.stdout.strip()
         except Exception as e:
             self.logger.warning(f"SQLite3 command-line tool not available: {e}")
-            result["details"]["error"] = "SQLite3 command-line tool not available"
+            result["details"]["error"] = _SQLITE_CLI_MISSING
             return result
         
         try:
-            # Create temporary SQL file for recovery
-            temp_sql_path = f"{db_path}_recovery.sql"
+            # Recover into a new database next to the original
+            new_db_path = f"{db_path}_recovered"
+            if os.path.exists(new_db_path):
+                os.remove(new_db_path)
             
-            # Construct recover command
+            # Construct recover and import commands
             command = [
                 "sqlite3", 
                 db_path, 
-                f".recover"
+                ".recover"
+            ]
+            import_command = [
+                "sqlite3",
+                new_db_path
             ]
             
-            # Run the command and capture output to SQL file
-            with open(temp_sql_path, 'w') as sql_file:
-                self.logger.info(f"Running SQLite .recover command")
-                process = subprocess.run(
+            # Pipe the recovered SQL straight into the importer instead of
+            # writing it to an intermediate file
+            self.logger.info("Running SQLite .recover piped into new database")
+            with tempfile.TemporaryFile() as recover_stderr:
+                recover_process = subprocess.Popen(
                     command,
-                    stdout=sql_file,
-                    stderr=subprocess.PIPE,
-                    text=True
+                    stdout=subprocess.PIPE,
+                    stderr=recover_stderr
                 )
+                import_process = subprocess.Popen(
+                    import_command,
+                    stdin=recover_process.stdout,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE
+                )
+                # Let .recover receive SIGPIPE if the importer exits early
+                recover_process.stdout.close()
+                _, import_stderr = import_process.communicate()
+                recover_process.wait()
+                recover_stderr.seek(0)
+                stderr = recover_stderr.read()
             
             result["details"]["command"] = " ".join(command)
-            result["details"]["return_code"] = process.returncode
-            result["details"]["stderr"] = process.stderr
+            result["details"]["return_code"] = recover_process.returncode
+            result["details"]["stderr"] = stderr.decode(errors="replace")
+            result["details"]["import_command"] = " ".join(import_command)
+            result["details"]["import_return_code"] = import_process.returncode
+            result["details"]["import_stderr"] = import_stderr.decode(errors="replace")
             
-            # Check if SQL file was created and has content
-            if os.path.exists(temp_sql_path) and os.path.getsize(temp_sql_path) > 0:
-                # Create a new database from the SQL file
-                new_db_path = f"{db_path}_recovered"
-                
-                # Import the SQL into a new database
-                import_command = [
-                    "sqlite3",
-                    new_db_path,
-                    f".read {temp_sql_path}"
-                ]
-                
-                self.logger.info(f"Importing recovered SQL into new database")
-                import_process = subprocess.run(
-                    import_command,
-                    capture_output=True,
-                    text=True
-                )
-                
-                result["details"]["import_command"] = " ".join(import_command)
-                result["details"]["import_return_code"] = import_process.returncode
-                result["details"]["import_stderr"] = import_process.stderr
-                
-                # If new database was created successfully, copy it to the original path
-                if os.path.exists(new_db_path) and os.path.getsize(new_db_path) > 0:
-                    shutil.copy2(new_db_path, db_path)
-                    self.logger.info(f"Recovered database copied to {db_path}")
-                    result["success"] = True
-                    
-                    # Clean up temporary files
-                    os.remove(new_db_path)
-                    os.remove(temp_sql_path)
-                else:
-                    self.logger.warning("Failed to create recovered database")
+            # If new database was created successfully, move it over the original path
+            if os.path.exists(new_db_path) and os.path.getsize(new_db_path) > 0:
+                os.replace(new_db_path, db_path)
+                self.logger.info(f"Recovered database moved to {db_path}")
+                result["success"] = True
             else:
-                self.logger.warning("No recovery SQL generated")
+                self.logger.warning("Failed to create recovered database")
+                if os.path.exists(new_db_path):
+                    os.remove(new_db_path)
         
         except Exception as e:
             self.logger.error(f"SQLite recover command failed: {e}")
@@ -546,47 +1257,76 @@ class DatabaseRepairTool:
             "success": False,
             "details": {
                 "tables_dumped": [],
-                "tables_reloaded": []
+                "tables_reloaded": [],
+                "indexes_recreated": []
             }
         }
         
+        conn = None
+        temp_conn = None
         try:
             # Connect to the database
             conn = sqlite3.connect(db_path)
+            self._apply_scan_pragmas(conn, exclusive=True)
             cursor = conn.cursor()
             
-            # Get list of tables
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row[0] for row in cursor.fetchall()]
+            # Get list of tables and their schemas
+            tables, schemas = self._get_tables(db_path, conn)
             
             if not tables:
                 self.logger.warning("No tables found in database")
                 conn.close()
                 return result
             
+            # Indexes are recreated after the data is loaded
+            cursor.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")
+            indexes = cursor.fetchall()
+            
             # Create a new database for the repaired version
             temp_db_path = f"{db_path}_temp"
             if os.path.exists(temp_db_path):
                 os.remove(temp_db_path)
             
-            temp_conn = sqlite3.connect(temp_db_path)
+            # The scratch database is discarded on failure, so keep the journal
+            # in memory (new pages are not journaled), skip fsyncs and manage
+            # transactions explicitly
+            temp_conn = sqlite3.connect(temp_db_path, isolation_level=None)
+            temp_conn.execute("PRAGMA journal_mode=MEMORY")
+            temp_conn.execute("PRAGMA synchronous=OFF")
+            temp_conn.execute(f"PRAGMA cache_size=-{self._scan_cache_kib // 2}")
+            
+            # Attach the source so tables can be copied with INSERT ... SELECT
+            try:
+                temp_conn.execute("ATTACH DATABASE ? AS src", (db_path,))
+                attached = True
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not attach source database: {e}")
+                attached = False
             
             # For each table, try to dump and reload
             for table in tables:
                 try:
                     # Get table schema
-                    cursor.execute(f"SELECT sql FROM sqlite_master WHERE type='table' AND name='{table}'")
-                    schema = cursor.fetchone()
+                    schema_sql = schemas.get(table)
                     
-                    if schema and schema[0]:
+                    if schema_sql:
                         # Create table in new database
-                        temp_conn.execute(schema[0])
+                        temp_conn.execute(schema_sql)
                         result["details"]["tables_dumped"].append(table)
                         
-                        # Try to copy data
+                        # Intact tables are copied without leaving SQLite
+                        if attached:
+                            copied, attached = self._copy_attached_table(temp_conn, db_path, table)
+                            if copied:
+                                result["details"]["tables_reloaded"].append(table)
+                                if self.logger.isEnabledFor(logging.DEBUG):
+                                    self.logger.debug(f"Table {table} copied and reloaded successfully")
+                                continue
+                        
+                        # Otherwise try to copy data, streaming rows from the
+                        # source cursor instead of materializing the whole table
                         try:
-                            cursor.execute(f"SELECT * FROM [{table}]")
-                            rows = cursor.fetchall()
+                            cursor.execute(f"SELECT * FROM {_quote_identifier(table)}")
                             
                             # Get column names
                             column_info = cursor.description
@@ -594,14 +1334,19 @@ class DatabaseRepairTool:
                             
                             # Prepare insert statement with placeholders
                             placeholders = ", ".join(["?" for _ in range(column_count)])
-                            insert_sql = f"INSERT INTO [{table}] VALUES ({placeholders})"
+                            insert_sql = f"INSERT INTO main.{_quote_identifier(table)} VALUES ({placeholders})"
                             
-                            # Insert data into new database
-                            temp_conn.executemany(insert_sql, rows)
-                            temp_conn.commit()
+                            # Insert data into new database in one transaction per table
+                            temp_conn.execute("BEGIN")
+                            try:
+                                temp_conn.executemany(insert_sql, cursor)
+                            finally:
+                                # Keep whatever rows were read before any error
+                                temp_conn.execute("COMMIT")
                             
                             result["details"]["tables_reloaded"].append(table)
-                            self.logger.info(f"Table {table} dumped and reloaded successfully")
+                            if self.logger.isEnabledFor(logging.DEBUG):
+                                self.logger.debug(f"Table {table} dumped and reloaded successfully")
                         except sqlite3.Error as e:
                             self.logger.warning(f"Could not copy data for table {table}: {e}")
                     else:
@@ -610,6 +1355,15 @@ class DatabaseRepairTool:
                 except sqlite3.Error as e:
                     self.logger.warning(f"Error processing table {table}: {e}")
             
+            # Recreate indexes now that the data is in place, which is much
+            # faster than maintaining them during the inserts
+            for index, index_sql in indexes:
+                try:
+                    temp_conn.execute(index_sql)
+                    result["details"]["indexes_recreated"].append(index)
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Could not recreate index {index}: {e}")
+            
             # Close connections
             conn.close()
             temp_conn.close()
@@ -629,8 +1383,58 @@ class DatabaseRepairTool:
             self.logger.error(f"Dump and reload repair failed: {e}")
             result["details"]["error"] = str(e)
         
+        finally:
+            # Release the exclusive scan lock even when the scan fails
+            if conn is not None:
+                conn.close()
+            if temp_conn is not None:
+                temp_conn.close()
+        
         return result
 
+    def _copy_attached_table(self, temp_conn: sqlite3.Connection, db_path: str,
+                             table: str) -> Tuple[bool, bool]:
+        """
+        Copy a table from the attached source database with INSERT ... SELECT.
+        
+        Rows never pass through Python, but the copy fails as a whole if the
+        scan hits corruption. The partial copy is then rolled back so the
+        caller can fall back to streaming the table row by row.
+        
+        Args:
+            temp_conn: Connection to the new database, with the source attached as "src"
+            db_path: Path to the source database
+            table: Name of the table to copy
+            
+        Returns:
+            Tuple of (whether the whole table was copied, whether the source
+            is still attached for the next table)
+        """
+        quoted = _quote_identifier(table)
+        try:
+            temp_conn.execute("BEGIN")
+            temp_conn.execute(f"INSERT INTO main.{quoted} SELECT * FROM src.{quoted}")
+            temp_conn.execute("COMMIT")
+            return True, True
+        except sqlite3.DatabaseError as e:
+            self.logger.debug(f"Bulk copy of table {table} failed, streaming rows instead: {e}")
+            try:
+                if temp_conn.in_transaction:
+                    temp_conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            temp_conn.execute(f"DELETE FROM main.{quoted}")
+            
+            # After hitting corruption SQLite may refuse to reload the attached
+            # schema, so attach the source afresh
+            try:
+                temp_conn.execute("DETACH DATABASE src")
+                temp_conn.execute("ATTACH DATABASE ? AS src", (db_path,))
+            except sqlite3.Error as attach_error:
+                self.logger.warning(f"Could not reattach source database, streaming all remaining tables: {attach_error}")
+                return False, False
+            return False, True
+
     def _salvage_data_repair(self, db_path: str) -> Dict[str, Any]:
         """
         Attempt to salvage as much data as possible from the database.
@@ -650,14 +1454,14 @@ class DatabaseRepairTool:
             }
         }
         
+        conn = None
         try:
             # Connect to the database
-            conn = sqlite3.connect(db_path)
+            conn = self._open_ro(db_path)
             cursor = conn.cursor()
             
-            # Get list of tables
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row[0] for row in cursor.fetchall()]
+            # Get list of tables and their schemas
+            tables, schemas = self._get_tables(db_path, conn)
             result["details"]["tables_found"] = tables
             
             if not tables:
@@ -665,31 +1469,28 @@ class DatabaseRepairTool:
                 conn.close()
                 return result
             
-            # For each table, try to salvage data
+            # Count the rows of every table with a schema in one batched query
+            readable = []
             for table in tables:
-                try:
-                    # Get table schema
-                    cursor.execute(f"SELECT sql FROM sqlite_master WHERE type='table' AND name='{table}'")
-                    schema = cursor.fetchone()
-                    
-                    if schema and schema[0]:
-                        # Try to count rows
-                        try:
-                            cursor.execute(f"SELECT COUNT(*) FROM [{table}]")
-                            count = cursor.fetchone()[0]
-                            self.logger.info(f"Table {table} has {count} rows")
-                            
-                            # If table has rows, consider it salvaged
-                            if count > 0:
-                                result["details"]["tables_salvaged"].append(table)
-                                result["details"]["rows_salvaged"][table] = count
-                        except sqlite3.Error as e:
-                            self.logger.warning(f"Could not count rows in table {table}: {e}")
-                    else:
-                        self.logger.warning(f"Could not get schema for table {table}")
+                if schemas.get(table):
+                    readable.append(table)
+                else:
+                    self.logger.warning(f"Could not get schema for table {table}")
+            counts, failures = _count_table_rows(cursor, readable)
+            
+            for table in readable:
+                if table in failures:
+                    self.logger.warning(f"Could not count rows in table {table}: {failures[table]}")
+                    continue
                 
-                except sqlite3.Error as e:
-                    self.logger.warning(f"Error processing table {table}: {e}")
+                count = counts[table]
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Table {table} has {count} rows")
+                
+                # If table has rows, consider it salvaged
+                if count > 0:
+                    result["details"]["tables_salvaged"].append(table)
+                    result["details"]["rows_salvaged"][table] = count
             
             conn.close()
             
@@ -700,116 +1501,215 @@ class DatabaseRepairTool:
                 
                 # For iMessage databases, extract messages to a separate file
                 if self.is_imessage and "message" in result["details"]["tables_salvaged"]:
-                    self._extract_imessage_data(db_path)
+                    extracted_path = self._extract_imessage_data(db_path)
+                    if extracted_path:
+                        result["details"]["extracted_messages_path"] = extracted_path
         
         except Exception as e:
             self.logger.error(f"Data salvage attempt failed: {e}")
             result["details"]["error"] = str(e)
         
+        finally:
+            # Release the exclusive scan lock even when the scan fails
+            if conn is not None:
+                conn.close()
+        
         return result
 
-    def _extract_imessage_data(self, db_path: str) -> None:
+    def _extract_imessage_data(self, db_path: str) -> Optional[str]:
         """
         Extract iMessage data to a separate file.
         
         Args:
             db_path: Path to the iMessage database
+            
+        Returns:
+            Path to the extracted messages file, or None if extraction failed
         """
+        output_path = None
         try:
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row
+            conn = self._open_ro(db_path)
             cursor = conn.cursor()
             
+            # Load contact handles once; the table is small compared to
+            # message, so a dict lookup is cheaper than joining it per row
+            try:
+                cursor.execute("SELECT rowid, id FROM handle")
+                handles = dict(cursor.fetchall())
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not read contact handles: {e}")
+                handles = {}
+            
             # Extract messages
             try:
                 query = """
                 SELECT 
-                    m.rowid as message_id,
-                    m.guid as unique_id,
-                    datetime(m.date/1000000000 + 978307200, 'unixepoch', 'localtime') as date_sent,
-                    m.text as message_body,
-                    m.is_from_me,
-                    h.id as contact_id
+                    rowid, guid, date, text, is_from_me, handle_id
                 FROM 
-                    message m
-                LEFT JOIN handle h ON m.handle_id = h.rowid
-                ORDER BY m.date
+                    message
+                ORDER BY date
                 """
                 
                 cursor.execute(query)
-                messages = [dict(row) for row in cursor.fetchall()]
                 
-                # Save to JSON file
+                # Stream messages to a JSON array one row at a time
                 output_path = os.path.join(self.output_dir, "extracted_messages.json")
-                with open(output_path, 'w') as f:
-                    json.dump(messages, f, indent=2)
+                message_count = 0
+                with open(output_path, 'w', buffering=1 << 20) as f:
+                    f.write('[')
+                    for rowid, guid, date, text, is_from_me, handle_id in cursor:
+                        if message_count:
+                            f.write(',\n')
+                        json.dump({
+                            "message_id": rowid,
+                            "unique_id": guid,
+                            "date_sent": _apple_time_to_local(date),
+                            "message_body": text,
+                            "is_from_me": is_from_me,
+                            "contact_id": handles.get(handle_id)
+                        }, f)
+                        message_count += 1
+                    f.write(']')
                 
-                self.logger.info(f"Extracted {len(messages)} messages to {output_path}")
-                self.results["extracted_messages_path"] = output_path
+                self.logger.info(f"Extracted {message_count} messages to {output_path}")
             
             except sqlite3.Error as e:
                 self.logger.warning(f"Could not extract messages: {e}")
+                output_path = None
             
             conn.close()
         
         except Exception as e:
             self.logger.error(f"Failed to extract iMessage data: {e}")
+            output_path = None
+        
+        return output_path
 
     def _generate_report(self) -> None:
         """Generate a detailed report of the repair process."""
-        # Add timestamp to results
+        # Add timestamp and report path to results
         self.results["timestamp"] = datetime.datetime.now().isoformat()
+        self.results["report_path"] = os.path.join(self.output_dir, f"repair_report_{self._base}.json")
+        
+        # Both writers spend their time encoding Python objects under the
+        # GIL, so they are run one after the other
+        self._write_json_report(self.results)
+        self._generate_html_report(self.results)
+
+    def _write_json_report(self, results: Dict[str, Any]) -> None:
+        """
+        Save the results to the JSON report file.
         
-        # Save results to JSON file
-        report_path = os.path.join(self.output_dir, f"repair_report_{os.path.splitext(self.db_filename)[0]}.json")
-        with open(report_path, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        Args:
+            results: Results to save, including the report path
+        """
+        report_path = results["report_path"]
+        if orjson is not None:
+            with open(report_path, 'wb', buffering=1 << 20) as f:
+                self._stream_write_json(f, results)
+        else:
+            with open(report_path, 'w') as f:
+                json.dump(results, f, indent=2)
         
-        self.results["report_path"] = report_path
         self.logger.info(f"Report saved to {report_path}")
+
+    def _stream_write_json(self, fp: BinaryIO, results: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write the results to a binary file as indented JSON using orjson.
+        
+        Top-level entries are encoded one at a time, and the items of top-level
+        lists such as repair_attempts one item at a time, so only a single
+        entry is held encoded in memory. The output matches json.dump(indent=2).
+        
+        Args:
+            fp: File opened in binary write mode
+            results: Results to write (default: self.results)
+        """
+        if results is None:
+            results = self.results
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        write = fp.write
         
-        # Generate HTML report
-        self._generate_html_report()
+        write(b"{")
+        for i, (key, value) in enumerate(results.items()):
+            write(b",\n  " if i else b"\n  ")
+            write(orjson.dumps(str(key)))
+            write(b": ")
+            if isinstance(value, list) and value:
+                # Newlines only occur between tokens; orjson escapes them in strings
+                write(b"[")
+                for j, item in enumerate(value):
+                    write(b",\n    " if j else b"\n    ")
+                    write(orjson.dumps(item, option=option).replace(b"\n", b"\n    "))
+                write(b"\n  ]")
+            else:
+                write(orjson.dumps(value, option=option).replace(b"\n", b"\n  "))
+        write(b"\n}" if results else b"}")
 
-    def _generate_html_report(self) -> None:
-        """Generate an HTML report of the repair process."""
-        html_path = os.path.join(self.output_dir, f"repair_report_{os.path.splitext(self.db_filename)[0]}.html")
+    def _generate_html_report(self, results: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Generate an HTML report of the repair process.
+        
+        Args:
+            results: Results to report on (default: self.results)
+        """
+        html_path = os.path.join(self.output_dir, f"repair_report_{self._base}.html")
+        
+        # Bind everything the row loops touch to locals up front
+        if results is None:
+            results = self.results
+        database_info = results['database_info']
+        original = results['original_validation']
+        repaired = results.get('repaired_validation')
+        errors = original.get('errors', [])
+        attempt_rows = self._attempt_html_rows
+        escape = _escape_html
         
-        html_content = f"""<!DOCTYPE html>
+        fragments: List[str] = []
+        w = fragments.append
+        
+        w("""<!DOCTYPE html>
 <html>
 <head>
     <title>Database Repair Report</title>
     <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; }}
-        h1, h2, h3 {{ color: #333; }}
-        .success {{ color: green; }}
-        .failure {{ color: red; }}
-        .warning {{ color: orange; }}
-        table {{ border-collapse: collapse; width: 100%; margin-bottom: 20px; }}
-        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-        th {{ background-color: #f2f2f2; }}
-        tr:nth-child(even) {{ background-color: #f9f9f9; }}
-        .section {{ margin-bottom: 30px; }}
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        h1, h2, h3 { color: #333; }
+        .success { color: green; }
+        .failure { color: red; }
+        .warning { color: orange; }
+        table { border-collapse: collapse; width: 100%; margin-bottom: 20px; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #f2f2f2; }
+        tr:nth-child(even) { background-color: #f9f9f9; }
+        .section { margin-bottom: 30px; }
     </style>
 </head>
 <body>
     <h1>Database Repair Report</h1>
-    <div class="section">
+""")
+        
+        # Summary
+        w(f"""    <div class="section">
         <h2>Summary</h2>
-        <p><strong>Database:</strong> {self.input_path}</p>
-        <p><strong>Timestamp:</strong> {self.results["timestamp"]}</p>
-        <p><strong>Status:</strong> <span class="{'success' if self.results['success'] else 'failure'}">
-            {("Repair Successful" if self.results['success'] else "Repair Failed")}
+        <p><strong>Database:</strong> {escape(self.input_path)}</p>
+        <p><strong>Timestamp:</strong> {escape(results["timestamp"])}</p>
+        <p><strong>Status:</strong> <span class="{'success' if results['success'] else 'failure'}">
+            {"Repair Successful" if results['success'] else "Repair Failed"}
         </span></p>
-        <p><strong>SQLite Version:</strong> {self.results['database_info']['sqlite_version']}</p>
-        <p><strong>Platform:</strong> {self.results['database_info']['platform']}</p>
-        <p><strong>Original Size:</strong> {self.results['database_info']['size']} bytes</p>
-        <p><strong>Type:</strong> {"iMessage Database" if self.results['database_info']['is_imessage'] else "SQLite Database"}</p>
+        <p><strong>SQLite Version:</strong> {escape(database_info['sqlite_version'])}</p>
+        <p><strong>Platform:</strong> {escape(database_info['platform'])}</p>
+        <p><strong>Original Size:</strong> {database_info['size']} bytes</p>
+        <p><strong>Type:</strong> {"iMessage Database" if database_info['is_imessage'] else "SQLite Database"}</p>
+""")
+        if results["repaired_path"]:
+            w(f"        <p><strong>Repaired Database:</strong> {escape(results['repaired_path'])}</p>\n")
+        if results["report_path"]:
+            w(f"        <p><strong>Report File:</strong> {escape(results['report_path'])}</p>\n")
+        w("    </div>\n")
         
-        {f'<p><strong>Repaired Database:</strong> {self.results["repaired_path"]}</p>' if self.results["repaired_path"] else ''}
-        {f'<p><strong>Report File:</strong> {self.results["report_path"]}</p>' if self.results["report_path"] else ''}
-    </div>
-
+        # Repair attempts
+        w("""
     <div class="section">
         <h2>Repair Attempts</h2>
         <table>
@@ -819,42 +1719,25 @@ class DatabaseRepairTool:
                 <th>Duration (s)</th>
                 <th>Details</th>
             </tr>
-            {''.join([f'''
-            <tr>
-                <td>{attempt['strategy']}</td>
-                <td class="{'success' if attempt['success'] else 'failure'}">{('Success' if attempt['success'] else 'Failed')}</td>
-                <td>{attempt.get('duration', 'N/A')}</td>
-                <td>{attempt.get('path', 'N/A')}</td>
-            </tr>
-            ''' for attempt in self.results['repair_attempts']])}
-        </table>
+""")
+        w("".join(attempt_rows))
+        w("""        </table>
     </div>
 
     <div class="section">
         <h2>Database Structure</h2>
-        <h3>Original Database</h3>
-        <p><strong>Integrity Check:</strong> <span class="{'success' if self.results['original_validation']['integrity_check'] == 'ok' else 'failure'}">
-            {self.results['original_validation'].get('integrity_check', 'Failed')}
-        </span></p>
+""")
         
-        <h4>Tables</h4>
-        <table>
-            <tr>
-                <th>Table Name</th>
-                <th>Row Count</th>
-            </tr>
-            {''.join([f'''
-            <tr>
-                <td>{table}</td>
-                <td>{self.results['original_validation']['table_counts'].get(table, 'N/A')}</td>
-            </tr>
-            ''' for table in self.results['original_validation'].get('tables', [])])}
-        </table>
-        
-        {'<h3>Repaired Database</h3>' if self.results.get('repaired_validation') else ''}
-        {f'''
-        <p><strong>Integrity Check:</strong> <span class="{'success' if self.results['repaired_validation']['integrity_check'] == 'ok' else 'failure'}">
-            {self.results['repaired_validation'].get('integrity_check', 'Failed')}
+        # Integrity result and row counts of the original and repaired databases
+        for heading, validation in (("Original Database", original), ("Repaired Database", repaired)):
+            if not validation:
+                continue
+            integrity = validation.get('integrity_check', 'Failed')
+            tables = validation.get('tables', [])
+            get_count = validation['table_counts'].get
+            w(f"""        <h3>{heading}</h3>
+        <p><strong>Integrity Check:</strong> <span class="{'success' if integrity == 'ok' else 'failure'}">
+            {escape(integrity)}
         </span></p>
         
         <h4>Tables</h4>
@@ -863,32 +1746,32 @@ class DatabaseRepairTool:
                 <th>Table Name</th>
                 <th>Row Count</th>
             </tr>
-            {''.join([f"""
-            <tr>
-                <td>{table}</td>
-                <td>{self.results['repaired_validation']['table_counts'].get(table, 'N/A')}</td>
-            </tr>
-            """ for table in self.results['repaired_validation'].get('tables', [])])}
-        </table>
-        ''' if self.results.get('repaired_validation') else ''}
-    </div>
-
+""")
+            for table in tables:
+                w(f"            <tr><td>{escape(table)}</td><td>{get_count(table, 'N/A')}</td></tr>\n")
+            w("        </table>\n")
+        w("    </div>\n")
+        
+        # Errors
+        w("""
     <div class="section">
         <h2>Errors</h2>
         <ul>
-            {''.join([f'<li class="failure">{error}</li>' for error in self.results['original_validation'].get('errors', [])])}
-        </ul>
+""")
+        for error in errors:
+            w(f'            <li class="failure">{escape(error)}</li>\n')
+        w(f"""        </ul>
     </div>
 
     <footer>
-        <p>Generated by Advanced SQLite Database Repair Tool on {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        <p>Generated by Advanced SQLite Database Repair Tool on {escape(results['timestamp'])}</p>
     </footer>
 </body>
 </html>
-"""
+""")
         
-        with open(html_path, 'w') as f:
-            f.write(html_content)
+        with open(html_path, 'w', buffering=1 << 20, encoding='utf-8', newline='') as f:
+            f.writelines(fragments)
         
         self.logger.info(f"HTML report saved to {html_path}")
 
@@ -924,6 +1807,18 @@ def main():
         help="Specify if the database is an iMessage database"
     )
     
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="Number of repair strategies to run in parallel (default: up to the CPU count)"
+    )
+    
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Abort any single integrity check or VACUUM after this many seconds"
+    )
+    
     parser.add_argument(
         "-v", "--version",
         action="version",
@@ -938,7 +1833,9 @@ def main():
         input_path=args.input_path,
         output_dir=args.output_dir,
         log_level=args.log_level,
-        is_imessage=args.imessage
+        is_imessage=args.imessage,
+        max_workers=args.jobs,
+        strategy_timeout=args.timeout
     )
     
     # Attempt repair
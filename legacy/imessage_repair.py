@@ -3,19 +3,24 @@ import shutil
 import sqlite3
 import subprocess
 import sys
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Databases up to this size are read into memory once and written out for
+# the backup and for every strategy's working copy
+MAX_IN_MEMORY_COPY = 512 * 1024 * 1024
+
+# Linux ioctl that clones a file's extents (reflink) on btrfs, XFS and similar
+FICLONE = 0x40049409
 
 def get_sqlite_version():
     """Check the installed SQLite version."""
-    try:
-        conn = sqlite3.connect(':memory:')
-        cursor = conn.cursor()
-        cursor.execute('SELECT sqlite_version()')
-        version = cursor.fetchone()[0]
-        conn.close()
-        return version
-    except Exception as e:
-        print(f"Could not determine SQLite version: {e}")
-        return None
+    # The version of the linked library, known without opening a connection
+    return sqlite3.sqlite_version
 
 def advanced_db_repair(input_path):
     """
@@ -26,8 +31,14 @@ def advanced_db_repair(input_path):
     backup_path = f"{base}_original_backup{ext}"
     repaired_path = f"{base}_advanced_repaired{ext}"
     
+    # Read the source once; the backup and every working copy are written from it
+    blob = None
+    if os.path.getsize(input_path) <= MAX_IN_MEMORY_COPY:
+        with open(input_path, 'rb') as src:
+            blob = src.read()
+    
     # Create backup
-    shutil.copy2(input_path, backup_path)
+    write_copy(input_path, backup_path, blob)
     print(f"Created backup: {backup_path}")
     
     # Repair strategies
@@ -46,7 +57,7 @@ def advanced_db_repair(input_path):
     for strategy in repair_strategies:
         try:
             # Create a fresh copy for each strategy
-            shutil.copy2(input_path, repaired_path)
+            write_copy(input_path, repaired_path, blob)
             
             print(f"Attempting repair with: {strategy.__name__}")
             if strategy(repaired_path):
@@ -58,6 +69,38 @@ def advanced_db_repair(input_path):
     print("All repair strategies failed.")
     return None
 
+def fast_copy(src, dst):
+    """
+    Copy src to dst, cloning instead of copying bytes where the filesystem supports it
+
+    On Linux filesystems with reflink support (btrfs, XFS) the FICLONE ioctl
+    makes a copy-on-write clone: it shares the original's blocks and takes no
+    time or space up front. Later writes to either file go to new blocks, so
+    changes to a working copy never reach the original.
+    Anywhere else this is a plain shutil.copy2.
+    """
+    if fcntl is not None and sys.platform.startswith('linux'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+    
+    shutil.copy2(src, dst)
+
+def write_copy(input_path, output_path, blob=None):
+    """
+    Write a copy of input_path to output_path, from blob if the source was read already
+    """
+    if blob is None:
+        fast_copy(input_path, output_path)
+        return
+    with open(output_path, 'wb', buffering=1 << 20) as dst:
+        dst.write(blob)
+    shutil.copystat(input_path, output_path)
+
 def simple_vacuum_repair(db_path):
     """
     Attempt a simple vacuum repair
@@ -74,25 +117,52 @@ def simple_vacuum_repair(db_path):
 
 def sqlite_recover_repair(db_path):
     """
-    Use SQLite's .recover command if available
+    Use SQLite's .recover command if available, otherwise dump what is readable in-process
     """
     try:
-        # Attempt to use sqlite3 command-line tool to recover
         output_path = f"{db_path}_recovered{os.path.splitext(db_path)[1]}"
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        
+        # .recover writes SQL to stdout; pipe it straight into a new database
+        try:
+            recover = subprocess.Popen(
+                ['sqlite3', db_path, '.recover'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            recover = None
         
-        # Construct recover command
-        command = [
-            'sqlite3', 
-            db_path, 
-            f'.recover {output_path}'
-        ]
+        dump_in_process = recover is None
+        if recover is None:
+            print("sqlite3 command-line tool not found, dumping in-process")
+        else:
+            importer = subprocess.Popen(
+                ['sqlite3', output_path],
+                stdin=recover.stdout,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            recover.stdout.close()
+            importer.wait()
+            recover.wait()
+            
+            # Older sqlite3 tools have no .recover; they fail and print nothing
+            if recover.returncode != 0 and not (os.path.exists(output_path) and os.path.getsize(output_path) > 0):
+                print("sqlite3 command-line tool has no .recover, dumping in-process")
+                dump_in_process = True
         
-        # Run the command
-        result = subprocess.run(command, capture_output=True, text=True)
+        if dump_in_process:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            dump_into(db_path, output_path)
         
-        # Check if recovery was successful
+        # Check if recovery was successful, and if so move the recovered
+        # database over the working copy the caller returns
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-            print(f"Recovered database saved to: {output_path}")
+            os.replace(output_path, db_path)
+            print(f"Recovered database saved to: {db_path}")
             return True
         
         return False
@@ -100,6 +170,26 @@ def sqlite_recover_repair(db_path):
         print(f"SQLite recover command failed: {e}")
         return False
 
+def dump_into(db_path, output_path):
+    """
+    Replay the SQL dump of db_path into a new database, keeping whatever was read before any error
+    """
+    src = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    dst = sqlite3.connect(output_path, isolation_level=None)
+    try:
+        for statement in src.iterdump():
+            try:
+                dst.execute(statement)
+            except sqlite3.Error:
+                pass
+    except sqlite3.Error as e:
+        print(f"Dump stopped early: {e}")
+    finally:
+        if dst.in_transaction:
+            dst.execute("COMMIT")
+        dst.close()
+        src.close()
+
 def salvage_data_repair(db_path):
     """
     Attempt to salvage as much data as possible
@@ -112,15 +202,29 @@ def salvage_data_repair(db_path):
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
         tables = cursor.fetchall()
         
-        # Print out table names and try to count rows
+        # Print out table names and try to count rows, all tables in one
+        # query first and one table at a time if that hits a damaged table
         print("Attempting to salvage data from tables:")
-        for table in tables:
-            table_name = table[0]
+        table_names = [table[0] for table in tables]
+        counts = {}
+        if table_names:
             try:
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                count = cursor.fetchone()[0]
-                print(f"Table: {table_name}, Rows: {count}")
+                cursor.execute(" UNION ALL ".join(
+                    f"SELECT {quote_literal(name)}, COUNT(*) FROM {quote_identifier(name)}"
+                    for name in table_names
+                ))
+                counts = dict(cursor.fetchall())
             except sqlite3.Error:
+                for name in table_names:
+                    try:
+                        cursor.execute(f"SELECT COUNT(*) FROM {quote_identifier(name)}")
+                        counts[name] = cursor.fetchone()[0]
+                    except sqlite3.Error:
+                        pass
+        for table_name in table_names:
+            if table_name in counts:
+                print(f"Table: {table_name}, Rows: {counts[table_name]}")
+            else:
                 print(f"Could not access table: {table_name}")
         
         conn.close()
@@ -129,6 +233,18 @@ def salvage_data_repair(db_path):
         print(f"Data salvage attempt failed: {e}")
         return False
 
+def quote_identifier(name):
+    """
+    Quote a table name for use in SQL
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+def quote_literal(value):
+    """
+    Quote a string as an SQL literal
+    """
+    return "'" + value.replace("'", "''") + "'"
+
 def main():
     # Paths
     input_file = r"D:\archived stuff\Messages\chat.db"
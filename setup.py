@@ -4,9 +4,10 @@ setup(
     name="dbfix",
     version="0.1.0",
     packages=find_packages(),
-    install_requires=[
-        "sqlite3",
-    ],
+    install_requires=[],
+    extras_require={
+        "fast": ["orjson", "markupsafe"],
+    },
     entry_points={
         'console_scripts': [
             'dbfix=core.repair_engine:main',
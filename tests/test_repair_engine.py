@@ -8,16 +8,37 @@ import os
 import tempfile
 import unittest
 import sqlite3
+import functools
+import io
+import json
+import multiprocessing
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from unittest import mock
 
 # Import the DatabaseRepairTool class
 # Note: This import will need to be adjusted based on the actual package structure
-from core.repair_engine import DatabaseRepairTool
+from core import repair_engine
+from core.repair_engine import DatabaseRepairTool, _apple_time_to_local
 
 
 class TestDatabaseRepairTool(unittest.TestCase):
     """Test cases for the DatabaseRepairTool class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the fixture databases once and keep their bytes."""
+        with tempfile.TemporaryDirectory() as build_dir:
+            golden_path = Path(build_dir) / "test.db"
+            cls._create_test_database(golden_path)
+            cls._golden = golden_path.read_bytes()
+            
+            corrupt_path = Path(build_dir) / "corrupted.db"
+            cls._create_corrupted_database(corrupt_path)
+            cls._corrupt = corrupt_path.read_bytes()
+
     def setUp(self):
         """Set up test fixtures."""
         # Create a temporary directory for test files
@@ -26,22 +47,28 @@ class TestDatabaseRepairTool(unittest.TestCase):
         
         # Create a test database
         self.test_db_path = self.test_dir / "test.db"
-        self._create_test_database(self.test_db_path)
+        self.test_db_path.write_bytes(self._golden)
         
         # Create a corrupted test database
         self.corrupted_db_path = self.test_dir / "corrupted.db"
-        self._create_corrupted_database(self.corrupted_db_path)
+        self.corrupted_db_path.write_bytes(self._corrupt)
 
     def tearDown(self):
         """Tear down test fixtures."""
         # Clean up temporary directory
         self.temp_dir.cleanup()
 
-    def _create_test_database(self, db_path):
+    @classmethod
+    def _create_test_database(cls, db_path):
         """Create a test SQLite database."""
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
+        # Fixtures are throwaway, so skip journaling and syncing
+        cursor.execute("PRAGMA journal_mode = OFF")
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        
         # Create a test table
         cursor.execute("""
         CREATE TABLE test_table (
@@ -62,15 +89,35 @@ class TestDatabaseRepairTool(unittest.TestCase):
         conn.commit()
         conn.close()
 
-    def _create_corrupted_database(self, db_path):
+    @classmethod
+    def _create_corrupted_database(cls, db_path):
         """Create a corrupted SQLite database for testing."""
         # First create a normal database
-        self._create_test_database(db_path)
+        cls._create_test_database(db_path)
+        
+        # Then corrupt it by pointing the first freeblock of page 2 (the
+        # test_table b-tree) past the end of the page, and write the whole
+        # file back in one go; the rows stay readable but integrity fails
+        data = bytearray(Path(db_path).read_bytes())
+        page_size = int.from_bytes(data[16:18], "big")
+        data[page_size + 1:page_size + 3] = b'\xff\xff'
+        Path(db_path).write_bytes(data)
+
+    def _create_wal_database(self, db_path):
+        """Create a WAL-mode test database whose rows are still only in its -wal file."""
+        source_path = self.test_dir / "wal_source.db"
+        conn = sqlite3.connect(source_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA wal_autocheckpoint = 0")
+        conn.execute("CREATE TABLE test_table (id INTEGER PRIMARY KEY, value INTEGER)")
+        conn.executemany("INSERT INTO test_table VALUES (?, ?)", [(i, i * 10) for i in range(100)])
+        conn.commit()
         
-        # Then corrupt it by writing random bytes in the middle
-        with open(db_path, 'r+b') as f:
-            f.seek(1024)  # Go to an offset
-            f.write(b'CORRUPTED_DATA_FOR_TESTING')
+        # Closing the last connection checkpoints and deletes the -wal file,
+        # so copy the database and its -wal/-shm files while it is open
+        for suffix in ("", "-wal", "-shm"):
+            shutil.copyfile(f"{source_path}{suffix}", f"{db_path}{suffix}")
+        conn.close()
 
     def test_initialization(self):
         """Test that the DatabaseRepairTool initializes correctly."""
@@ -101,6 +148,130 @@ class TestDatabaseRepairTool(unittest.TestCase):
         self.assertTrue(validation_results["is_valid_sqlite"])  # Header should still be valid
         self.assertNotEqual(validation_results["integrity_check"], "ok")  # Should fail integrity check
 
+    def test_validate_database_counts_all_tables(self):
+        """Test that row counts are collected for every table, including quirky names."""
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute('CREATE TABLE "odd ""name"" [x]" (id INTEGER)')
+        conn.executemany('INSERT INTO "odd ""name"" [x]" VALUES (?)', [(1,), (2,)])
+        conn.commit()
+        conn.close()
+
+        repair_tool = DatabaseRepairTool(
+            input_path=str(self.test_db_path),
+            output_dir=str(self.test_dir)
+        )
+
+        validation_results = repair_tool.validate_database(str(self.test_db_path))
+        self.assertEqual(validation_results["table_counts"]["test_table"], 3)
+        self.assertEqual(validation_results["table_counts"]['odd "name" [x]'], 2)
+        self.assertEqual(validation_results["errors"], [])
+
+    def test_validate_database_cache(self):
+        """Test that validation results are reused until the database changes."""
+        repair_tool = DatabaseRepairTool(
+            input_path=str(self.test_db_path),
+            output_dir=str(self.test_dir)
+        )
+
+        first = repair_tool.validate_database(str(self.test_db_path))
+        self.assertIs(repair_tool.validate_database(str(self.test_db_path)), first)
+
+        # Changing the database invalidates the cached result
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute("CREATE TABLE another_table (id INTEGER)")
+        conn.commit()
+        conn.close()
+        second = repair_tool.validate_database(str(self.test_db_path))
+        self.assertIsNot(second, first)
+        self.assertIn("another_table", second["tables"])
+
+    def test_validate_database_hot_journal(self):
+        """Test that a database copied mid-transaction is validated after rolling back its journal."""
+        source_path = self.test_dir / "source.db"
+        conn = sqlite3.connect(source_path)
+        conn.execute("PRAGMA cache_size = 1")
+        conn.execute("CREATE TABLE test_table (id INTEGER PRIMARY KEY, value BLOB)")
+        conn.executemany("INSERT INTO test_table VALUES (?, zeroblob(200))", [(i,) for i in range(2000)])
+        conn.commit()
+        
+        # Spill half-written pages to the file, then copy it with its journal
+        conn.execute("BEGIN")
+        conn.execute("UPDATE test_table SET value = randomblob(300)")
+        conn.execute("DELETE FROM test_table WHERE id % 3 = 0")
+        hot_path = self.test_dir / "hot.db"
+        shutil.copyfile(source_path, hot_path)
+        shutil.copyfile(f"{source_path}-journal", f"{hot_path}-journal")
+        conn.rollback()
+        conn.close()
+
+        repair_tool = DatabaseRepairTool(
+            input_path=str(hot_path),
+            output_dir=str(self.test_dir)
+        )
+
+        validation_results = repair_tool.validate_database(str(hot_path), fast=False)
+        self.assertEqual(validation_results["integrity_check"], "ok")
+        self.assertEqual(validation_results["table_counts"]["test_table"], 2000)
+        # The original and its journal are left untouched
+        self.assertTrue(os.path.exists(f"{hot_path}-journal"))
+
+    def test_validate_database_wal(self):
+        """Test that a WAL database is validated with the rows still in its -wal file."""
+        wal_path = self.test_dir / "wal.db"
+        self._create_wal_database(wal_path)
+
+        repair_tool = DatabaseRepairTool(
+            input_path=str(wal_path),
+            output_dir=str(self.test_dir)
+        )
+
+        validation_results = repair_tool.validate_database(str(wal_path), fast=False)
+        self.assertEqual(validation_results["integrity_check"], "ok")
+        self.assertEqual(validation_results["table_counts"]["test_table"], 100)
+        self.assertEqual(validation_results["errors"], [])
+
+    def test_validate_database_timeout(self):
+        """Test that an integrity check cut off by the time limit is recorded as a timeout."""
+        large_path = self.test_dir / "large.db"
+        conn = sqlite3.connect(large_path)
+        conn.execute("CREATE TABLE test_table (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.execute("CREATE INDEX test_index ON test_table(name)")
+        conn.execute("""
+        INSERT INTO test_table (name)
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 300000)
+        SELECT printf('Item %d', i) FROM n
+        """)
+        conn.commit()
+        conn.close()
+
+        repair_tool = DatabaseRepairTool(
+            input_path=str(large_path),
+            output_dir=str(self.test_dir),
+            strategy_timeout=0.001
+        )
+
+        validation_results = repair_tool.validate_database(str(large_path), fast=False)
+        self.assertTrue(validation_results["timed_out"])
+        self.assertIsNone(validation_results["integrity_check"])
+        self.assertIn("Integrity check timed out after 0.001s", validation_results["errors"])
+        
+        # Timed-out results are not cached, so a longer limit checks again
+        repair_tool.strategy_timeout = None
+        validation_results = repair_tool.validate_database(str(large_path), fast=False)
+        self.assertFalse(validation_results["timed_out"])
+        self.assertEqual(validation_results["integrity_check"], "ok")
+
+    def test_create_backup_reuses_identical_backup(self):
+        """Test that an unchanged database is not backed up twice."""
+        repair_tool = DatabaseRepairTool(
+            input_path=str(self.test_db_path),
+            output_dir=str(self.test_dir)
+        )
+
+        first_backup = repair_tool.create_backup()
+        self.assertEqual(Path(first_backup).read_bytes(), self.test_db_path.read_bytes())
+        self.assertEqual(repair_tool.create_backup(), first_backup)
+
     def test_repair_database(self):
         """Test the database repair method."""
         repair_tool = DatabaseRepairTool(
@@ -124,5 +295,206 @@ class TestDatabaseRepairTool(unittest.TestCase):
             # and which repair strategy was used, so we don't assert on that
 
 
+    def test_dump_and_reload_streams_damaged_table(self):
+        """Test that a table the bulk copy cannot read is streamed and later tables still bulk copy."""
+        db_path = self.test_dir / "mixed.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE damaged_table (id INTEGER PRIMARY KEY, payload TEXT)")
+        conn.executemany("INSERT INTO damaged_table VALUES (?, ?)", [(i, "x" * 100) for i in range(500)])
+        conn.execute("CREATE TABLE intact_table (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.executemany("INSERT INTO intact_table VALUES (?, ?)", [(i, f"Item {i}") for i in range(10)])
+        conn.commit()
+        intact_root = conn.execute(
+            "SELECT rootpage FROM sqlite_master WHERE name = 'intact_table'").fetchone()[0]
+        conn.close()
+        
+        # The pages just before intact_table's root are damaged_table's last
+        # leaf; an invalid page type there breaks scans near the end of it
+        data = bytearray(db_path.read_bytes())
+        page_size = int.from_bytes(data[16:18], "big")
+        data[(intact_root - 2) * page_size] = 0xff
+        db_path.write_bytes(data)
+
+        repair_tool = DatabaseRepairTool(
+            input_path=str(db_path),
+            output_dir=str(self.test_dir)
+        )
+        result = repair_tool._dump_and_reload_repair(str(db_path))
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["details"]["tables_dumped"], ["damaged_table", "intact_table"])
+        self.assertIn("intact_table", result["details"]["tables_reloaded"])
+        
+        conn = sqlite3.connect(db_path)
+        damaged_rows = conn.execute("SELECT COUNT(*) FROM damaged_table").fetchone()[0]
+        intact_rows = conn.execute("SELECT COUNT(*) FROM intact_table").fetchone()[0]
+        conn.close()
+        # Streaming keeps the rows read before the damaged page
+        self.assertGreater(damaged_rows, 0)
+        self.assertLess(damaged_rows, 500)
+        self.assertEqual(intact_rows, 10)
+
+    def test_strategies_to_skip(self):
+        """Test that salvage is only skipped when dump and reload found no readable schemas."""
+        repair_tool = DatabaseRepairTool(
+            input_path=str(self.test_db_path),
+            output_dir=str(self.test_dir)
+        )
+        
+        no_schemas = {"details": {"tables_dumped": []}}
+        self.assertIn("_salvage_data_repair",
+                      repair_tool._strategies_to_skip("_dump_and_reload_repair", no_schemas))
+        
+        # A failure writing the scratch database says nothing about the schemas
+        write_failed = {"details": {"tables_dumped": [], "error": "database or disk is full"}}
+        self.assertEqual(repair_tool._strategies_to_skip("_dump_and_reload_repair", write_failed), {})
+
+    def test_repair_database_wal(self):
+        """Test that a healthy WAL database with its -wal file needs no repair."""
+        wal_path = self.test_dir / "wal.db"
+        self._create_wal_database(wal_path)
+
+        repair_tool = DatabaseRepairTool(
+            input_path=str(wal_path),
+            output_dir=str(self.test_dir),
+            max_workers=1
+        )
+
+        self.assertTrue(repair_tool.repair_database())
+        self.assertEqual(repair_tool.results["original_validation"]["errors"], [])
+        self.assertEqual(repair_tool.results["repaired_path"], str(wal_path))
+        self.assertEqual(repair_tool.results["repair_attempts"], [])
+
+    def test_repair_database_index_damage(self):
+        """Test that a copy passing only quick_check does not count as a repair."""
+        # Point the index at a different column so its entries no longer
+        # match the table; quick_check skips that comparison
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute("CREATE INDEX test_index ON test_table(name)")
+        conn.commit()
+        conn.execute("PRAGMA writable_schema = ON")
+        conn.execute("UPDATE sqlite_master SET sql = 'CREATE INDEX test_index ON test_table(value)' "
+                     "WHERE name = 'test_index'")
+        conn.commit()
+        conn.close()
+
+        repair_tool = DatabaseRepairTool(
+            input_path=str(self.test_db_path),
+            output_dir=str(self.test_dir),
+            max_workers=1
+        )
+        
+        # Leave only the strategies that keep the damaged index as it is
+        failed = lambda db_path: {"success": False, "details": {}}
+        repair_tool._sqlite_recover_repair = failed
+        repair_tool._dump_and_reload_repair = failed
+        repair_tool._salvage_data_repair = failed
+        
+        self.assertFalse(repair_tool.repair_database())
+        self.assertIsNone(repair_tool.results["repaired_path"])
+
+
+    def test_repair_database_parallel(self):
+        """Test that worker processes log and pick the same repair as an in-process run."""
+        results = {}
+        for workers in (1, 2):
+            output_dir = self.test_dir / f"workers_{workers}"
+            repair_tool = DatabaseRepairTool(
+                input_path=str(self.corrupted_db_path),
+                output_dir=str(output_dir),
+                max_workers=workers
+            )
+            
+            # Spawned workers start without the parent's logging setup
+            spawn_executor = functools.partial(
+                ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn"))
+            with mock.patch.object(repair_engine, "ProcessPoolExecutor", spawn_executor):
+                self.assertTrue(repair_tool.repair_database())
+            
+            attempts = repair_tool.results["repair_attempts"]
+            log_text = Path(repair_tool.log_file).read_text()
+            self.assertEqual(log_text.count("Attempting repair with"),
+                             sum("skipped" not in attempt for attempt in attempts))
+            
+            # Strategy copies are named <repaired path>__<strategy method>
+            results[workers] = repair_tool.results["repaired_path"].split("__")[-1]
+        
+        self.assertEqual(results[2], results[1])
+
+
+    @unittest.skipIf(repair_engine.orjson is None, "orjson is not installed")
+    def test_stream_write_json_matches_json_dump(self):
+        """Test that the streamed orjson report is byte for byte what json.dump(indent=2) writes."""
+        repair_tool = DatabaseRepairTool(
+            input_path=str(self.test_db_path),
+            output_dir=str(self.test_dir)
+        )
+        results = {
+            "database_info": {"original_path": str(self.test_db_path), "size": 8192, "is_imessage": False},
+            "repair_attempts": [
+                {"strategy": " Vacuum Repair", "success": True, "path": "/tmp/a.db", "duration": 0.004778,
+                 "details": {}},
+                {"strategy": " Salvage Data Repair", "success": False, "skipped": "line one\nline two"},
+                {"strategy": " Dump And Reload Repair", "success": False,
+                 "details": {"tables_dumped": [], "nested": [[1, 2], [], {"k": None}]}},
+            ],
+            "tables_recovered": [],
+            "original_validation": {"integrity_check": "*** in database main ***\nPage 2: corrupt",
+                                    "table_counts": {"caf\u00e9": 3}, "errors": []},
+            "success": True,
+            "repaired_path": None,
+        }
+        
+        for value in (results, {}):
+            with self.subTest(keys=list(value)):
+                buffer = io.BytesIO()
+                repair_tool._stream_write_json(buffer, value)
+                self.assertEqual(buffer.getvalue().decode("utf-8"),
+                                 json.dumps(value, indent=2, ensure_ascii=False))
+
+
+class TestAppleTimeToLocal(unittest.TestCase):
+    """Test cases for the _apple_time_to_local helper."""
+
+    def setUp(self):
+        """Use a time zone with an offset and DST so 'localtime' matters."""
+        self.saved_tz = os.environ.get("TZ")
+        if hasattr(time, "tzset"):
+            os.environ["TZ"] = "America/New_York"
+            time.tzset()
+
+    def tearDown(self):
+        """Restore the original time zone."""
+        if self.saved_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self.saved_tz
+        if hasattr(time, "tzset"):
+            time.tzset()
+
+    def test_matches_sqlite_datetime(self):
+        """Test that Python formatting matches SQLite's datetime() for every kind of date."""
+        timestamps = [
+            None,
+            0,
+            700000000123456789,    # nanoseconds, winter
+            712345678900000000,    # nanoseconds, summer
+            -1500000000,           # before 2001, truncated toward zero
+            -86400999999999,
+            7.123456789e17,        # REAL column value
+            600000000,             # seconds since 2001, as old databases store
+        ]
+        conn = sqlite3.connect(":memory:")
+        try:
+            for timestamp in timestamps:
+                with self.subTest(timestamp=timestamp):
+                    expected = conn.execute(
+                        "SELECT datetime(? / 1000000000 + 978307200, 'unixepoch', 'localtime')",
+                        (timestamp,)
+                    ).fetchone()[0]
+                    self.assertEqual(_apple_time_to_local(timestamp), expected)
+        finally:
+            conn.close()
+
 if __name__ == '__main__':
     unittest.main()